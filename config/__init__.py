@@ -1,10 +1,24 @@
+import functools
+import os
 import hydra
+import msgspec
 from typing import Optional
 from omegaconf import DictConfig, OmegaConf
 from .models import ProjectConfig, ForumConfig, FinancialAPIConfig
 
 _config: Optional[DictConfig] = None
 
+# Config YAML is trusted, so models are built directly (no type checks).
+# Set STOCK_ANALYZER_STRICT_CONFIG=1 (as CI does) to type-check via `msgspec.convert`.
+STRICT_CONFIG_ENV = "STOCK_ANALYZER_STRICT_CONFIG"
+
+def _build_model(model, section: DictConfig):
+    data = OmegaConf.to_container(section, resolve=True)
+    if os.getenv(STRICT_CONFIG_ENV, "").lower() in ("1", "true", "yes"):
+        return msgspec.convert(data, type=model)
+    # Drop undeclared keys, as convert would
+    return model(**{k: v for k, v in data.items() if k in model.__struct_fields__})
+
 # def get_config() -> DictConfig:
 #     global _config
 #     # If the configuration is not already loaded, initialize and compose it
@@ -23,16 +37,27 @@ _config: Optional[DictConfig] = None
 
 # @hydra.main(config_path=".", config_name="config")
 # @hydra.main(config_path="config", config_name="config")
+@functools.lru_cache(maxsize=1)
 def get_config():
-    # Convert relevant config sections to Pydantic models
+    # Convert relevant config sections to msgspec Structs
+    # Memoized: Hydra initialize/compose runs once per process
     with hydra.initialize(config_path="."):
         cfg = hydra.compose(config_name="config.yaml")
-    project = ProjectConfig(**cfg.project)
-    forum = ForumConfig(**cfg.forum)
-    api = FinancialAPIConfig(**cfg.financial_api)
+    project = _build_model(ProjectConfig, cfg.project)
+    forum = _build_model(ForumConfig, cfg.forum)
+    api = _build_model(FinancialAPIConfig, cfg.financial_api)
     companies_suffix = cfg.get("company_suffixes", None)
     return project, forum, api, companies_suffix
 
+_LAZY_ATTRS = ("project_cfg", "forum_cfg", "api_cfg", "companies_suffix")
+
+def __getattr__(name: str):
+    # PEP 562: compose the Hydra config on first attribute access, not at import
+    if name in _LAZY_ATTRS:
+        globals().update(zip(_LAZY_ATTRS, get_config()))
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Usage example (from any script):
-# from config import get_config
-project_cfg, forum_cfg, api_cfg, companies_suffix = get_config()
+# import config
+# config.forum_cfg.base_url  # loaded on first access
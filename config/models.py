@@ -1,15 +1,17 @@
-from pydantic import BaseModel, Field
+from typing import Optional
+import msgspec
 
-class ProjectConfig(BaseModel):
-    name: str = Field(..., description="Project name")
-    data_dir: str = Field(default="./data")
-    log_dir: str = Field(default="./logs")
+class ProjectConfig(msgspec.Struct):
+    name: str  # Project name
+    data_dir: str = "./data"
+    log_dir: str = "./logs"
 
-class ForumConfig(BaseModel):
+class ForumConfig(msgspec.Struct):
     base_url: str
     update_frequency: str = "weekly"
+    max_threads: Optional[int] = None
 
-class FinancialAPIConfig(BaseModel):
+class FinancialAPIConfig(msgspec.Struct):
     provider: str
     api_key: str
     update_frequency: str = "weekly"
@@ -36,9 +36,25 @@ MOCK_METRICS = {
     # ...
 }
 
+@st.cache_data
+def load_sentiments() -> pd.DataFrame:
+    """
+    Sentiment scores indexed by (company, month), memoized across Streamlit reruns.
+    """
+    rows = [
+        {"company": c, "month": r["month"], "Sentiment Score": r["score"]}
+        for c, company_rows in MOCK_SENTIMENTS.items()
+        for r in company_rows
+    ]
+    # Explicit columns: with no rows there would be nothing to build the (company, month) index from
+    df = pd.DataFrame(rows, columns=["company", "month", "Sentiment Score"])
+    return df.set_index(["company", "month"]).sort_index()
+
 st.set_page_config(page_title="AI Stock Picker Dashboard", layout="wide")
 st.title("📈 AI Stock Picker Dashboard")
 
+SENT_DF = load_sentiments()
+
 # Sidebar controls
 company = st.sidebar.selectbox("Select Company", MOCK_COMPANIES)
 st.sidebar.markdown("---")
@@ -47,12 +63,9 @@ st.sidebar.markdown("---")
 st.header(f"Analysis for {company}")
 
 # Sentiment trend
-sent_data = MOCK_SENTIMENTS.get(company, [])
-if sent_data:
-    months = [x["month"] for x in sent_data]
-    scores = [x["score"] for x in sent_data]
+if company in SENT_DF.index.get_level_values("company"):
     st.subheader("Sentiment Trend")
-    st.line_chart(pd.DataFrame({"Sentiment Score": scores}, index=months))
+    st.line_chart(SENT_DF.loc[company])
 else:
     st.info("No sentiment data available.")
 
@@ -5,11 +5,14 @@ Production-grade module to fetch threads and posts from the Stock Opportunities
 Designed for maintainability, modularity, and robust error handling.
 """
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
-import requests
-from datetime import datetime
+import ahocorasick
+import httpx
+import orjson
 from utils.logger import setup_logger
-from config import forum_cfg, companies_suffix
+import config
 from tqdm import tqdm
 logger = setup_logger(__name__)
 
@@ -17,57 +20,93 @@ class ValuePickrForumScraper:
     """
     Scrapes threads and posts from ValuePickr Stock Opportunities forum.
     """
-    def __init__(self, base_url: str = "https://forum.valuepickr.com/c/stock-opportunities"):
+    def __init__(self, base_url: str = "https://forum.valuepickr.com/c/stock-opportunities", max_workers: int = 16):
         self.base_url = base_url.rstrip("/")
         self.api_url = f"{self.base_url}.json"
-        self.session = requests.Session()
-        self.comp_suffixes = set(companies_suffix)
+        self.max_workers = max_workers
+        # HTTP/2 client: concurrent fetches multiplex over a shared TLS connection
+        self.client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=15,
+        )
+        self.comp_suffixes = set(config.companies_suffix)
+        # Precompiled once; title parsing runs for every thread
+        self._split_sep = re.compile(r"[-~:]")
+        self._split_paren = re.compile(r"\(")
+        # Aho-Corasick automaton over lowercased suffixes: one scan per title
+        self._suffix_automaton = ahocorasick.Automaton()
+        for suffix in self.comp_suffixes:
+            suffix_lower = suffix.lower()
+            self._suffix_automaton.add_word(suffix_lower, len(suffix_lower))
+        self._suffix_automaton.make_automaton()
         logger.info(f"Initialized scraper for {self.base_url}")
     
     def extract_company_from_title(self, title: str) -> str:
         # Split on common separators
-        base = re.split(r"[-~:]", title, maxsplit=1)[0]
+        base = self._split_sep.split(title, maxsplit=1)[0]
         # Remove content in parentheses only if it appears after company base
-        base = re.split(r"\(", base)[0]
+        base = self._split_paren.split(base, maxsplit=1)[0]
         # Remove leading/trailing whitespace and common words
         base = base.strip().replace("  ", " ")
+        base_lower = base.lower()
 
-        # If the base ends with one of our suffixes, keep as is.
-        # Otherwise, try to extend base to include suffix if present in title
-        for suffix in self.comp_suffixes:
-            if suffix.lower() in base.lower():
-                # Rebuild base to the point where suffix occurs
-                match = re.search(rf'(.+?\s*{suffix})', base, re.IGNORECASE)
-                if match:
-                    return match.group(1).strip()
+        # Truncate base right after the first suffix that follows some name text
+        # (matches are yielded by end offset), dropping anything after it:
+        # "Reliance Industries Ltd" -> "Reliance Industries", "ICICI Bank Ltd." -> "ICICI Bank".
+        # Without such a suffix, the base is title-cased instead.
+        if self._suffix_automaton.kind == ahocorasick.AHOCORASICK:  # unbuilt when no suffixes
+            for end, length in self._suffix_automaton.iter(base_lower):
+                if end - length + 1 > 0:
+                    return base[:end + 1].strip()
         # Title-case for readability (can be changed as needed)
         return base.title()
 
+    def _get_page(self, page: int) -> Optional[Dict]:
+        """
+        Fetches a single page of the topic list.
+        Args:
+            page (int): 1-based page number.
+        Returns:
+            Optional[Dict]: The page's `topic_list`, or None on error.
+        """
+        url = f"{self.api_url}?page={page}"
+        try:
+            resp = self.client.get(url)
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+            topic_list = data.get('topic_list', {})
+            logger.debug(f"Fetched {len(topic_list.get('topics', []))} threads from page {page}")
+            return topic_list
+        except Exception as e:
+            logger.error(f"Failed to fetch threads from {url}: {e}")
+            return None
+
     def fetch_threads(self, max_pages: int = 5) -> List[Dict]:
         """
         Fetch list of threads (topics) from the Stock Opportunities category (paginated).
+        Pages are requested concurrently; results are consumed in page order.
         Args:
             max_pages (int): Number of forum pages to fetch.
         Returns:
             List[Dict]: List of thread metadata dicts.
         """
         threads = []
-        
+
         logger.info(f"Fetching threads from {self.api_url} (max {max_pages} pages)")
-        for page in tqdm(range(0, 100)):
-            url = f"{self.api_url}?page={page + 1}"
-            try:
-                resp = self.session.get(url, timeout=15)
-                resp.raise_for_status()
-                data = resp.json()
-                page_threads = data.get('topic_list', {}).get('topics', [])
-                threads.extend(page_threads)
-                logger.info(f"Fetched {len(page_threads)} threads from page {page + 1}")
-                if not page_threads:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pages = executor.map(self._get_page, range(1, max_pages + 1))
+            for topic_list in tqdm(pages, total=max_pages):
+                # Stop at the first failed or empty page
+                if not topic_list or not topic_list.get('topics'):
+                    break
+                threads.extend(topic_list['topics'])
+                # Discourse omits `more_topics_url` on the last page
+                if topic_list.get('more_topics_url') is None:
                     break
-            except Exception as e:
-                logger.error(f"Failed to fetch threads from {url}: {e}")
-                break
+            # Drop page requests that haven't started yet
+            executor.shutdown(cancel_futures=True)
+        logger.info(f"Fetched {len(threads)} threads from {self.api_url}")
         return threads
 
     def fetch_posts(self, thread_id: int) -> List[Dict]:
@@ -81,11 +120,11 @@ class ValuePickrForumScraper:
         posts = []
         url = f"https://forum.valuepickr.com/t/{thread_id}.json"
         try:
-            resp = self.session.get(url, timeout=20)
+            resp = self.client.get(url, timeout=20)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
             posts = data.get('post_stream', {}).get('posts', [])
-            logger.info(f"Fetched {len(posts)} posts for thread {thread_id}")
+            logger.debug(f"Fetched {len(posts)} posts for thread {thread_id}")
         except Exception as e:
             logger.error(f"Failed to fetch posts for thread {thread_id}: {e}")
         return posts
@@ -99,31 +138,38 @@ class ValuePickrForumScraper:
             Dict[str, List[Dict]]: {YYYY-MM: [posts]}
         """
         threads = self.fetch_threads()
-        company_posts = {}  # {company: {month: [posts]}}
+        company_posts = defaultdict(lambda: defaultdict(list))  # {company: {month: [posts]}}
         
-        threads = threads[forum_cfg.max_threads] if hasattr(forum_cfg, 'max_threads') else threads
+        threads = threads[:config.forum_cfg.max_threads]  # None keeps all threads
         
         logger.info(f"Processing {len(threads)} threads for monthly aggregation")
-        for thread in tqdm(threads):
-            title = thread.get("title", "")
-            company = self.extract_company_from_title(title)
-            print(f"Processing for company: {company}")
-            thread_id = thread.get('id')
-            if thread_id is None: continue
-            posts = self.fetch_posts(thread_id)
-            
-            for post in posts:
-                created_at = post.get('created_at')
-                if not created_at: continue
-                dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                month_key = dt.strftime('%Y-%m')
-                company_posts.setdefault(company, {}).setdefault(month_key, []).append(post)
+        total_posts = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for thread in threads:
+                thread_id = thread.get('id')
+                if thread_id is None: continue
+                company = self.extract_company_from_title(thread.get("title", ""))
+                futures.append((executor.submit(self.fetch_posts, thread_id), company))
+
+            # Consumed in submission order (not completion order) so each month's post
+            # order, and hence its summary, doesn't depend on network timing
+            progress = tqdm(futures)
+            for future, company in progress:
+                progress.set_postfix(company=company)
+                posts = future.result()
+                total_posts += len(posts)
+                if not posts: continue
+                months = company_posts[company]
+                for post in posts:
+                    created_at = post.get('created_at')
+                    if not created_at: continue
+                    # Discourse timestamps are ISO-8601, so the month is the 'YYYY-MM' prefix
+                    months[created_at[:7]].append(post)
 
-                # if month_key not in company_posts:
-                #     company_posts[month_key] = []
-                # company_posts[month_key].append(post)
+        logger.info(f"Fetched {total_posts} posts across {len(futures)} threads")
         logger.info(f"Aggregated posts by month: {[(k, len(v)) for k,v in company_posts.items()]}")
-        return company_posts
+        return {company: dict(months) for company, months in company_posts.items()}
 
 # Example usage:
 # scraper = ValuePickrForumScraper()
@@ -7,9 +7,12 @@ Modular, extensible, robust error handling and logging.
 - Initial implementation: EODHD and yfinance (for Indian tickers)
 - Can be extended for Screener.in or RapidAPI integrations
 """
-from typing import Dict, Optional
-import requests
-import yfinance as yf
+import copy
+import functools
+from datetime import date
+from typing import Dict, Optional, Tuple
+import httpx
+import orjson
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -21,51 +24,86 @@ class FinancialDataFetcher:
     def __init__(self, eodhd_api_key: Optional[str] = None):
         self.eodhd_api_key = eodhd_api_key
         self.eodhd_base_url = "https://eodhd.com/api/fundamentals/"
+        self.client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=15,
+        )
+        # Fundamentals change at most daily: memoize by (symbol, exchange, day); only today's entries are kept
+        self._eodhd_cache: Dict[tuple, Dict] = {}
 
     def fetch_eodhd(self, symbol: str, exchange: str = "NSE") -> Dict:
         """
         Fetches fundamentals from EODHD API.
+        Results are cached for the rest of the day; each call returns an independent copy.
         Args:
             symbol (str): Stock ticker symbol.
             exchange (str): e.g. 'NSE' or 'BSE'
         Returns:
             Dict: Fundamentals data (or empty dict on error)
         """
+        today = date.today()
+        key = (symbol, exchange, today)
+        if key in self._eodhd_cache:
+            return copy.deepcopy(self._eodhd_cache[key])  # deep copy: nested dicts would otherwise be shared with the cache
         url = f"{self.eodhd_base_url}{symbol}.{exchange}?api_token={self.eodhd_api_key}&fmt=json"
         try:
-            resp = requests.get(url, timeout=15)
+            resp = self.client.get(url)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
+            # Drop previous days' entries so a long-running scheduler doesn't accumulate them
+            for stale in [k for k in self._eodhd_cache if k[2] != today]:
+                del self._eodhd_cache[stale]
+            self._eodhd_cache[key] = data
             logger.info(f"Fetched EODHD data for {symbol}.{exchange}")
-            return data
+            return copy.deepcopy(data)
         except Exception as e:
             logger.error(f"Failed to fetch EODHD data for {symbol}.{exchange}: {e}")
             return {}
 
-    def fetch_yfinance(self, symbol: str) -> Dict:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _fetch_yf_raw(symbol: str, fields: Tuple[str, ...], day: date) -> Dict:
+        """
+        Fetches the requested yfinance fields, memoized per (symbol, fields, day).
+        Raises on failure so errors are never cached.
+        """
+        import yfinance as yf  # deferred: heavy import, only needed here
+        ticker = yf.Ticker(symbol)
+        data = {}
+        if "info" in fields:
+            data["info"] = ticker.info
+        # `.financials` is a separate Yahoo request plus a DataFrame conversion: only when asked
+        if "financials" in fields:
+            data["financials"] = ticker.financials.to_dict() if hasattr(ticker, 'financials') else {}
+        return data
+
+    def fetch_yfinance(self, symbol: str, fields: Tuple[str, ...] = ("info",)) -> Dict:
         """
         Fetches current and historical financials from Yahoo Finance.
+        Results are cached for the rest of the day; each call returns an independent copy.
         Args:
             symbol (str): Stock ticker symbol (use 'RELIANCE.NS' for NSE stocks)
+            fields (Tuple[str, ...]): Any of 'info', 'financials'
         Returns:
             Dict: Financial data summary
         """
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            financials = ticker.financials.to_dict() if hasattr(ticker, 'financials') else {}
+            # Deep copy: the lru_cache entry (and its nested 'info'/'financials' dicts) must not be mutated
+            data = copy.deepcopy(self._fetch_yf_raw(symbol, tuple(fields), date.today()))
             logger.info(f"Fetched yfinance data for {symbol}")
-            return {"info": info, "financials": financials}
+            return data
         except Exception as e:
             logger.error(f"Failed to fetch yfinance data for {symbol}: {e}")
             return {}
 
-    def fetch_all(self, symbol: str, exchange: str = "NSE") -> Dict:
+    def fetch_all(self, symbol: str, exchange: str = "NSE", yf_fields: Tuple[str, ...] = ("info",)) -> Dict:
         """
         Aggregates all sources for a given symbol.
         Args:
             symbol (str): Stock ticker
             exchange (str): 'NSE' or 'BSE'
+            yf_fields (Tuple[str, ...]): yfinance fields to fetch (see `fetch_yfinance`)
         Returns:
             Dict: Aggregated data
         """
@@ -73,7 +111,7 @@ class FinancialDataFetcher:
         if self.eodhd_api_key:
             data["eodhd"] = self.fetch_eodhd(symbol, exchange)
         yf_symbol = f"{symbol}.NS" if exchange.upper() == "NSE" else f"{symbol}.BO"
-        data["yfinance"] = self.fetch_yfinance(yf_symbol)
+        data["yfinance"] = self.fetch_yfinance(yf_symbol, yf_fields)
         return data
 
 # Example usage:
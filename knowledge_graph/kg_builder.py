@@ -3,10 +3,10 @@ Knowledge Graph Construction Module
 ----------------------------------
 Builds and updates a property graph (Neo4j) to capture companies, metrics, sentiment, and relationships.
 - Modular and production-grade
-- Uses py2neo for Neo4j operations
+- Uses the official neo4j driver with fixed, parameterized Cypher queries
 """
 from typing import Dict, List, Optional
-from py2neo import Graph, Node, Relationship
+from neo4j import GraphDatabase
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -15,21 +15,84 @@ class KnowledgeGraphBuilder:
     """
     Builds and updates the knowledge graph for stocks, metrics, sentiment, and peer links.
     """
+    # Fixed query strings: parameters only, so the server reuses cached plans
+    _Q_INDEX = "CREATE INDEX company_symbol IF NOT EXISTS FOR (c:Company) ON (c.symbol)"
+    _Q_UPSERT = (
+        "MERGE (c:Company {symbol: $symbol}) "
+        "SET c.name = coalesce($name, c.name), c.sector = coalesce($sector, c.sector)"
+    )
+    _Q_METRIC = (
+        "MATCH (c:Company {symbol: $symbol}) "
+        "MERGE (m:Metric {name: $name, value: $value}) "
+        "MERGE (c)-[:HAS_METRIC]->(m) "
+        "RETURN count(*)"
+    )
+    _Q_METRICS_BULK = (
+        "UNWIND $rows AS r "
+        "MATCH (c:Company {symbol: r.symbol}) "
+        "MERGE (m:Metric {name: r.name, value: r.value}) "
+        "MERGE (c)-[:HAS_METRIC]->(m)"
+    )
+    _Q_SENTIMENT = (
+        "MATCH (c:Company {symbol: $symbol}) "
+        "MERGE (s:Sentiment {month: $month, score: $score}) "
+        "MERGE (c)-[:HAS_SENTIMENT]->(s) "
+        "RETURN count(*)"
+    )
+    _Q_SENTIMENTS_BULK = (
+        "UNWIND $rows AS r "
+        "MATCH (c:Company {symbol: r.symbol}) "
+        "MERGE (s:Sentiment {month: r.month, score: r.score}) "
+        "MERGE (c)-[:HAS_SENTIMENT]->(s)"
+    )
+    _Q_PEER = (
+        "MATCH (c1:Company {symbol: $symbol1}), (c2:Company {symbol: $symbol2}) "
+        "MERGE (c1)-[:COMPETES_WITH]->(c2) "
+        "RETURN count(*)"
+    )
+    _Q_COMPANY_METRICS = (
+        "MATCH (c:Company {symbol: $symbol})-[:HAS_METRIC]->(m:Metric) "
+        "RETURN m.name as metric, m.value as value"
+    )
+
     def __init__(self, uri: str, user: str, password: str):
         try:
-            self.graph = Graph(uri, auth=(user, password))
+            self.driver = GraphDatabase.driver(uri, auth=(user, password))
+            self.driver.verify_connectivity()
             logger.info(f"Connected to Neo4j at {uri}")
         except Exception as e:
             logger.error(f"Neo4j connection failed: {e}")
             raise
+        self._ensure_indexes()
+
+    def close(self):
+        """
+        Closes the driver and its connection pool.
+        """
+        self.driver.close()
+
+    def _ensure_indexes(self):
+        """
+        Creates the lookup index used by every Company MERGE/MATCH.
+        """
+        try:
+            self.driver.execute_query(self._Q_INDEX)
+        except Exception as e:
+            logger.error(f"Failed to create Company.symbol index: {e}")
+
+    def _write_linked(self, query: str, **params) -> bool:
+        """
+        Runs a link query ending in RETURN count(*); True if anything was linked.
+        """
+        records, _, _ = self.driver.execute_query(query, params)
+        return bool(records and records[0][0])
 
     def upsert_company(self, symbol: str, name: Optional[str] = None, sector: Optional[str] = None):
         """
         Ensures a Company node exists (creates or updates).
         """
         try:
-            company = Node("Company", symbol=symbol, name=name, sector=sector)
-            self.graph.merge(company, "Company", "symbol")
+            self.driver.execute_query(self._Q_UPSERT, symbol=symbol, name=name, sector=sector)
             logger.info(f"Upserted company: {symbol}")
         except Exception as e:
             logger.error(f"Failed to upsert company {symbol}: {e}")
@@ -39,12 +102,7 @@ class KnowledgeGraphBuilder:
         Adds/updates a Metric node and links it to the company.
         """
         try:
-            metric_node = Node("Metric", name=metric, value=value)
-            self.graph.merge(metric_node, "Metric", ["name", "value"])
-            company = self.graph.nodes.match("Company", symbol=symbol).first()
-            if company:
-                rel = Relationship(company, "HAS_METRIC", metric_node)
-                self.graph.merge(rel)
+            if self._write_linked(self._Q_METRIC, symbol=symbol, name=metric, value=value):
                 logger.info(f"Linked {symbol} to metric {metric}={value}")
         except Exception as e:
             logger.error(f"Failed to add metric {metric} for {symbol}: {e}")
@@ -54,26 +112,45 @@ class KnowledgeGraphBuilder:
         Adds a Sentiment node for a company/month and links it.
         """
         try:
-            sent_node = Node("Sentiment", month=month, score=score)
-            self.graph.merge(sent_node, "Sentiment", ["month", "score"])
-            company = self.graph.nodes.match("Company", symbol=symbol).first()
-            if company:
-                rel = Relationship(company, "HAS_SENTIMENT", sent_node)
-                self.graph.merge(rel)
+            if self._write_linked(self._Q_SENTIMENT, symbol=symbol, month=month, score=score):
                 logger.info(f"Linked {symbol} to sentiment {score} for {month}")
         except Exception as e:
             logger.error(f"Failed to add sentiment for {symbol} {month}: {e}")
 
+    def add_metrics_bulk(self, rows: List[Dict]):
+        """
+        Adds/updates many Metric nodes and links them to their companies in one transaction.
+        Args:
+            rows (List[Dict]): [{'symbol': ..., 'name': ..., 'value': ...}]
+        """
+        if not rows:
+            return
+        try:
+            self.driver.execute_query(self._Q_METRICS_BULK, rows=rows)
+            logger.info(f"Linked {len(rows)} metrics in bulk")
+        except Exception as e:
+            logger.error(f"Failed to add {len(rows)} metrics in bulk: {e}")
+
+    def add_sentiments_bulk(self, rows: List[Dict]):
+        """
+        Adds many Sentiment nodes and links them to their companies in one transaction.
+        Args:
+            rows (List[Dict]): [{'symbol': ..., 'month': ..., 'score': ...}]
+        """
+        if not rows:
+            return
+        try:
+            self.driver.execute_query(self._Q_SENTIMENTS_BULK, rows=rows)
+            logger.info(f"Linked {len(rows)} sentiments in bulk")
+        except Exception as e:
+            logger.error(f"Failed to add {len(rows)} sentiments in bulk: {e}")
+
     def add_peer_link(self, symbol1: str, symbol2: str):
         """
         Adds a COMPETES_WITH relationship between two companies.
         """
         try:
-            c1 = self.graph.nodes.match("Company", symbol=symbol1).first()
-            c2 = self.graph.nodes.match("Company", symbol=symbol2).first()
-            if c1 and c2:
-                rel = Relationship(c1, "COMPETES_WITH", c2)
-                self.graph.merge(rel)
+            if self._write_linked(self._Q_PEER, symbol1=symbol1, symbol2=symbol2):
                 logger.info(f"Linked {symbol1} <-> {symbol2} as peers")
         except Exception as e:
             logger.error(f"Failed to add peer link {symbol1}-{symbol2}: {e}")
@@ -83,11 +160,8 @@ class KnowledgeGraphBuilder:
         Returns all metrics for a company.
         """
         try:
-            query = (
-                "MATCH (c:Company {symbol: $symbol})-[:HAS_METRIC]->(m:Metric) "
-                "RETURN m.name as metric, m.value as value"
-            )
-            result = self.graph.run(query, symbol=symbol).data()
+            records, _, _ = self.driver.execute_query(self._Q_COMPANY_METRICS, symbol=symbol, routing_="r")
+            result = [record.data() for record in records]
             logger.info(f"Queried metrics for {symbol}")
             return result
         except Exception as e:
@@ -98,8 +172,9 @@ class KnowledgeGraphBuilder:
 # kg = KnowledgeGraphBuilder(uri="bolt://localhost:7687", user="neo4j", password="password")
 # kg.upsert_company("RELIANCE", name="Reliance Industries", sector="Conglomerate")
 # kg.add_metric("RELIANCE", "ROCE", 18.4)
+# kg.add_metrics_bulk([{"symbol": "RELIANCE", "name": "ROE", "value": 9.2}, ...])
 # kg.add_sentiment("RELIANCE", "2024-06", 82)
 # kg.add_peer_link("RELIANCE", "IOC")
 # print(kg.query_company_metrics("RELIANCE"))
+# kg.close()
 # kg_builder.py
-
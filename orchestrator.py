@@ -6,7 +6,9 @@ Integrates all modules for a full end-to-end run.
 - Modular and ready for production scheduling
 """
 import os
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional, Tuple
+import torch
 from config import project_cfg, forum_cfg, api_cfg
 from data_ingestion.forum_scraper import ValuePickrForumScraper
 from preprocessing.text_cleaning import TextPreprocessor
@@ -22,12 +24,43 @@ from utils.env import load_environment
 load_environment()
 logger = setup_logger(__name__)
 
+# Each NLP worker holds its own copy of the spaCy/DistilBART/DistilBERT weights: keep the pool small
+DEFAULT_NLP_WORKERS = 2
+
+# NLP models of the current worker process, loaded once by `_init_worker`
+_worker_models: Dict = {}
+
+def _init_worker(workers: int):
+    # Split the cores between workers instead of every torch runtime using all of them
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    _worker_models["pre"] = TextPreprocessor()
+    _worker_models["summarizer"] = Summarizer()
+    _worker_models["sa"] = SentimentAnalyzer()
+    # Models load lazily; do it up front so every task in this worker runs warm
+    _worker_models["summarizer"].warmup()
+    _worker_models["sa"].warmup()
+
+def _process(company: str, month: str, posts: List[Dict]) -> Tuple[str, str, str, int]:
+    """
+    CPU-bound NLP for one company/month (cleaning, summary, sentiment); runs in a worker process.
+    Returns:
+        Tuple[str, str, str, int]: (company, month, summary, sentiment score)
+    """
+    clean = _worker_models["pre"].preprocess_batch([p["cooked"] for p in posts])
+    summary = _worker_models["summarizer"].summarize_posts(clean)
+    sentiments = _worker_models["sa"].batch_score(clean)
+    sentiment_score = int(sum([x["score"] for x in sentiments]) / max(1, len(sentiments)))
+    return company, month, summary, sentiment_score
+
 class StockAnalysisPipeline:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Worker processes for NLP (default: `DEFAULT_NLP_WORKERS`, capped at the CPU count).
+                Every worker loads all NLP models and gets `cpu_count // max_workers` torch threads.
+        """
         self.scraper = ValuePickrForumScraper(base_url=forum_cfg.base_url)
-        self.pre = TextPreprocessor()
-        self.summarizer = Summarizer()
-        self.sa = SentimentAnalyzer()
+        self.max_workers = max_workers or min(DEFAULT_NLP_WORKERS, os.cpu_count() or 1)
         self.fetcher = FinancialDataFetcher(os.getenv("EODHD_API_KEY"))
         self.screener = StockScreener()
         self.kg = KnowledgeGraphBuilder(
@@ -35,30 +68,50 @@ class StockAnalysisPipeline:
             user=os.getenv("NEO4J_USER"),
             password=os.getenv("NEO4J_PASSWORD"),
         )
-        self.rag = RAGPipeline()
+        index_path = os.path.join(project_cfg.data_dir, "rag.index")
+        # Reopen the persisted vector store so only new summaries are embedded
+        self.rag = RAGPipeline.load(index_path) if os.path.exists(index_path + ".meta.pkl") else RAGPipeline(index_path=index_path)
 
     def get_company_posts(self):
         return self.scraper.scrape_company_monthly_posts()
 
-    def process_company_month(self, company, month, posts):
-        clean = [self.pre.preprocess(p["cooked"]) for p in posts]
-        summary = self.summarizer.summarize_posts(clean)
-        sentiments = self.sa.batch_score(clean)
-        sentiment_score = int(sum([x["score"] for x in sentiments]) / max(1, len(sentiments)))
+    def process_company_financials(self, company):
+        # Fundamentals don't vary by month: fetch and store them once per company
         metrics = self.fetcher.fetch_all(company)
         passed = self.screener.filter_stocks([metrics])
         self.kg.upsert_company(company, name=company)
-        for m, v in metrics.get("eodhd", {}).items():
-            self.kg.add_metric(company, m, v)
-        self.kg.add_sentiment(company, month, sentiment_score)
-        self.rag.add_documents([summary], [{"company": company, "month": month}])
-        logger.info(f"Processed {company} for {month}.")
+        self.kg.add_metrics_bulk(
+            [{"symbol": company, "name": m, "value": v} for m, v in metrics.get("eodhd", {}).items()]
+        )
 
     def run(self):
         company_posts = self.get_company_posts()
-        for company, monthly_posts in company_posts.items():
-            for month, posts in monthly_posts.items():
-                self.process_company_month(company, month, posts)
+        sentiments = []
+        summaries, summary_meta = [], []
+        # NLP runs in worker processes; Neo4j and the vector store are only written from here
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers, initializer=_init_worker, initargs=(self.max_workers,)
+        ) as executor:
+            futures = [
+                executor.submit(_process, company, month, posts)
+                for company, monthly_posts in company_posts.items()
+                for month, posts in monthly_posts.items()
+            ]
+            for company in company_posts:
+                self.process_company_financials(company)
+            for future in as_completed(futures):
+                try:
+                    company, month, summary, sentiment_score = future.result()
+                except Exception as e:
+                    logger.error(f"Company/month processing failed: {e}")
+                    continue
+                summaries.append(summary)
+                summary_meta.append({"company": company, "month": month})
+                sentiments.append({"symbol": company, "month": month, "score": sentiment_score})
+                logger.info(f"Processed {company} for {month}.")
+        # One add (and one index write) for the whole run
+        self.rag.add_documents(summaries, summary_meta)
+        self.kg.add_sentiments_bulk(sentiments)
         logger.info("Pipeline run complete.")
 
 if __name__ == "__main__":
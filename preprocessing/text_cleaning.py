@@ -5,24 +5,83 @@ Cleans and normalizes raw forum post text for downstream NLP tasks.
 - Modular and production-grade
 - Easily extended for extra cleaning, language detection, or normalization steps
 """
+from functools import cached_property
 from typing import List
 import re
 import unicodedata
-import spacy
 from utils.logger import setup_logger
 
+try:
+    import hyperscan
+except ImportError:  # optional: clean_many falls back to the `re` path
+    hyperscan = None
+
 logger = setup_logger(__name__)
 
+def _collect_span(match_id: int, start: int, end: int, flags: int, spans: list):
+    """Hyperscan match callback: records the byte range to drop (URL matches: just their "http" prefix)."""
+    spans.append((match_id, start, end))
+
+def _drop_spans(data: bytes, spans: list) -> bytes:
+    """Returns `data` with the (possibly overlapping) byte ranges removed."""
+    out = bytearray()
+    pos = 0
+    for start, end in sorted(spans):
+        if start > pos:
+            out += data[pos:start]
+        pos = max(pos, end)
+    out += data[pos:]
+    return bytes(out)
+
 class TextPreprocessor:
     """
     Cleans and preprocesses text: lowercasing, punctuation, stopword removal, lemmatization, etc.
     """
-    def __init__(self, language: str = "en"):
+    _RE_WS = re.compile(r"\s+")
+    # URLs and special chars (except basic punct.) removed in one scan
+    _RE_STRIP = re.compile(r"http\S+|[^\w\s.,!?]")
+
+    def __init__(self, language: str = "en", use_hyperscan: bool = False):
+        """
+        Args:
+            language: spaCy language ('en' loads en_core_web_sm).
+            use_hyperscan: Clean batches with Hyperscan (`hyperscan` extra). Opt-in: it is faster on
+                plain prose but slower on URL-heavy posts, where every special char is a Python callback.
+        """
         self.language = language
+        if use_hyperscan and hyperscan is None:
+            logger.warning("hyperscan is not installed; cleaning text with re.")
+        self._hs_db = self._build_hyperscan_db() if use_hyperscan and hyperscan is not None else None
+
+    @staticmethod
+    def _build_hyperscan_db():
+        """
+        Compiles the `_RE_STRIP` patterns into a Hyperscan database (DFA matching, all matches reported).
+        URLs are matched by their "http" prefix only and extended to the next space in `clean_many`:
+        `http\\S+` would report a match (one Python callback) per URL character.
+        """
+        flags = hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[rb"http\S", rb"[^\w\s.,!?]"], ids=[0, 1], elements=2,
+                flags=[flags, flags | hyperscan.HS_FLAG_SOM_LEFTMOST],
+            )
+            return db
+        except Exception as e:
+            logger.error(f"Failed to compile Hyperscan database, using re: {e}")
+            return None
+
+    @cached_property
+    def nlp(self):
+        """
+        spaCy pipeline, loaded on first use.
+        """
+        import spacy  # deferred: heavy import
         try:
-            self.nlp = spacy.load("en_core_web_sm") if language == "en" else spacy.blank(language)
+            return spacy.load("en_core_web_sm") if self.language == "en" else spacy.blank(self.language)
         except Exception as e:
-            logger.error(f"Failed to load spaCy model for language '{language}': {e}")
+            logger.error(f"Failed to load spaCy model for language '{self.language}': {e}")
             raise
 
     def clean_text(self, text: str) -> str:
@@ -31,11 +90,35 @@ class TextPreprocessor:
         """
         text = unicodedata.normalize("NFKC", text)
         text = text.lower()
-        text = re.sub(r"\s+", " ", text)           # Collapse whitespace
-        text = re.sub(r"http\S+", "", text)        # Remove URLs
-        text = re.sub(r"[^\w\s.,!?]", "", text)   # Remove special chars except basic punct.
+        text = self._RE_WS.sub(" ", text)          # Collapse whitespace
+        text = self._RE_STRIP.sub("", text)        # Remove URLs and special chars
         return text.strip()
 
+    def clean_many(self, texts: List[str]) -> List[str]:
+        """
+        Batched `clean_text`. Scans with Hyperscan when enabled (`use_hyperscan`), else uses `clean_text`.
+        """
+        if self._hs_db is None:
+            return [self.clean_text(text) for text in texts]
+        results = []
+        for text in texts:
+            text = unicodedata.normalize("NFKC", text).lower()
+            data = self._RE_WS.sub(" ", text).encode("utf-8")
+            matches = []
+            if data:
+                self._hs_db.scan(data, match_event_handler=_collect_span, context=matches)
+            spans = []
+            for match_id, start, end in matches:
+                if match_id == 0:
+                    # "http" + one non-space char (end is exclusive, the char may be multi-byte):
+                    # whitespace is already collapsed to " ", so the URL runs to the next space
+                    start = data.rindex(b"http", 0, end)
+                    end = data.find(b" ", end)
+                    end = len(data) if end < 0 else end
+                spans.append((start, end))
+            results.append(_drop_spans(data, spans).decode("utf-8").strip())
+        return results
+
     def tokenize_lemmatize(self, text: str) -> List[str]:
         """
         Tokenize and lemmatize using spaCy, removing stopwords and punctuation.
@@ -51,9 +134,21 @@ class TextPreprocessor:
         tokens = self.tokenize_lemmatize(cleaned)
         return " ".join(tokens)
 
+    def preprocess_batch(self, texts: List[str], batch_size: int = 64) -> List[str]:
+        """
+        Batched equivalent of `preprocess` for many texts.
+        Streams docs through `nlp.pipe` with the parser and NER disabled (only lemmas are used).
+        """
+        cleaned = self.clean_many(texts)
+        return [
+            " ".join(token.lemma_ for token in doc if not token.is_stop and not token.is_punct and token.lemma_)
+            for doc in self.nlp.pipe(cleaned, batch_size=batch_size, disable=["parser", "ner"])
+        ]
+
 # Example usage:
 # pre = TextPreprocessor()
 # out = pre.preprocess("Forum text... with lots of  Stuff! Visit http://... ")
+# outs = pre.preprocess_batch(["First post...", "Second post..."])
 # logger.info(f"Preprocessed text: {out}")
 # text_cleaning.py
 
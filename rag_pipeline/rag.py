@@ -6,11 +6,16 @@ Implements a Retrieval-Augmented Generation (RAG) system:
 - Enables semantic search and context-aware LLM answers
 - Modular, production-grade, easily extensible
 """
-from typing import List, Optional
+import os
+import pickle
+import time
+from functools import cached_property
+from typing import List, Optional, Union
 import numpy as np
 import faiss
+import torch
 from sentence_transformers import SentenceTransformer
-from transformers import pipeline
+from summarization.summarizer import load_summarization_pipeline
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -19,22 +24,158 @@ class RAGPipeline:
     """
     Retrieval-Augmented Generation pipeline: semantic search + LLM answer.
     """
-    def __init__(self, embedding_model_name: str = "all-MiniLM-L6-v2", llm_model_name: str = "facebook/bart-large-cnn", device: Optional[int] = None):
+    INDEX_TYPES = ("flat", "hnsw", "ivfpq", "sq8")
+    # Compressed indexes fetch RERANK_FACTOR * top_k candidates, re-scored exactly from `_emb_store`
+    RERANK_FACTOR = 4
+    # Semantic answer cache: near-duplicate queries (cosine >= threshold) reuse a prior answer
+    QCACHE_THRESHOLD = 0.9
+    QCACHE_MAX_SIZE = 512
+    QCACHE_TTL_SECONDS = 300
+    # rag_answer returns the top doc verbatim (no LLM call) when it is this close to the query
+    DIRECT_HIT_THRESHOLD = 0.85
+    DIRECT_HIT_MAX_CHARS = 600
+    # Bulk ingestion above this size is sharded over all GPUs / CPU workers
+    MULTI_PROCESS_MIN_DOCS = 1024
+
+    def __init__(self, embedding_model_name: str = "all-MiniLM-L6-v2", llm_model_name: str = "sshleifer/distilbart-cnn-12-6", device: Optional[int] = None, index_type: str = "hnsw", nlist: int = 4096, index_path: Optional[str] = None):
+        """
+        Args:
+            index_type: 'flat' (exact scan), 'hnsw' (graph ANN), 'ivfpq' (compressed ANN for large corpora)
+                or 'sq8' (exact scan over 8-bit scalar-quantized vectors, 1/4 the memory of 'flat').
+            nlist: IVF cells for 'ivfpq'; searched exactly until enough docs exist to train it
+                (39 per cell, and at least 39 * 256 for the 8-bit PQ codebooks).
+            device: -1/None for CPU, or a GPU id; 'flat'/'ivfpq' indexes are then kept on that GPU.
+            index_path: If set, the index (and docs/metadata next to it) is written there after every
+                `add_documents`; reopen it with `RAGPipeline.load` instead of re-embedding.
+        """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {self.INDEX_TYPES}, got {index_type!r}")
+        if nlist < 1:
+            raise ValueError(f"nlist must be >= 1, got {nlist}")
+        self.index_type = index_type
+        self.nlist = nlist
+        self.device = device
+        self.index_path = index_path
+        self._gpu_res = None
+        if device is not None and device >= 0:
+            if index_type in ("hnsw", "sq8"):
+                logger.info(f"FAISS has no GPU {index_type} index; keeping the vector index on CPU.")
+            else:
+                self._gpu_res = faiss.StandardGpuResources()
+        # Models are loaded on first use (or by `warmup()`)
+        self.embedding_model_name = embedding_model_name
+        self.llm_model_name = llm_model_name
+        self.docs = []  # List[str]: stores text chunks
+        self.doc_metadata = []  # List[dict]: metadata (e.g., month, company)
+        self.index = None  # inner product over L2-normalized embeddings == cosine similarity
+        self._ivfpq_trained = False
+        self._index_mmapped = False  # memory-mapped indexes are read-only until reloaded
+        self._emb_store: Optional[np.ndarray] = None  # FP16; rows [0, len(self.docs)) are in use
+        # Query cache: row i of the index <-> answers/top_k/created/last-used entry i
+        self._qcache_clear()
+        self.direct_hits = 0  # rag_answer calls served by DIRECT_HIT_THRESHOLD
+
+    @cached_property
+    def embedder(self) -> SentenceTransformer:
         try:
-            self.embedder = SentenceTransformer(embedding_model_name)
-            logger.info(f"Loaded embedding model: {embedding_model_name}")
+            embedder = SentenceTransformer(self.embedding_model_name)
+            logger.info(f"Loaded embedding model: {self.embedding_model_name}")
+            return embedder
         except Exception as e:
             logger.error(f"Failed to load embedder: {e}")
             raise
+
+    @cached_property
+    def llm(self):
         try:
-            self.llm = pipeline("summarization", model=llm_model_name, device=device if device is not None else -1)
-            logger.info(f"Loaded LLM: {llm_model_name}")
+            llm = load_summarization_pipeline(self.llm_model_name, self.device)
+            logger.info(f"Loaded LLM: {self.llm_model_name}")
+            return llm
         except Exception as e:
             logger.error(f"Failed to load LLM: {e}")
             raise
-        self.docs = []  # List[str]: stores text chunks
-        self.doc_metadata = []  # List[dict]: metadata (e.g., month, company)
-        self.index = None
+
+    def warmup(self):
+        """
+        Loads the embedder and LLM now instead of on first use (for latency-sensitive services).
+        """
+        self.embedder
+        self.llm
+
+    def _store_embeddings(self, embeddings: np.ndarray):
+        """
+        Appends embeddings to `_emb_store`, growing capacity geometrically to amortize copies.
+        """
+        n = len(self.docs)
+        needed = n + embeddings.shape[0]
+        if self._emb_store is None or needed > self._emb_store.shape[0]:
+            capacity = max(needed, 2 * (0 if self._emb_store is None else self._emb_store.shape[0]), 64)
+            grown = np.empty((capacity, embeddings.shape[1]), dtype=np.float16)
+            if self._emb_store is not None:
+                grown[:n] = self._emb_store[:n]
+            self._emb_store = grown
+        self._emb_store[n:needed] = embeddings
+
+    def _on_device(self, index):
+        """
+        Moves a CPU index to the configured GPU (no-op on CPU).
+        """
+        if self._gpu_res is None:
+            return index
+        return faiss.index_cpu_to_gpu(self._gpu_res, self.device, index)
+
+    def _new_index(self, embeddings: np.ndarray):
+        """
+        Creates an empty inner-product index of `index_type` ('ivfpq' starts flat, see `_maybe_train_ivfpq`).
+        """
+        dim = embeddings.shape[1]
+        if self.index_type == "sq8":
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+            # Fixed [-1, 1] range per dimension (valid for L2-normalized embeddings): ranges learned
+            # from the first batch would clamp every later vector that falls outside them
+            index.train(np.stack([-np.ones(dim, np.float32), np.ones(dim, np.float32)]))
+            return index
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 200
+            index.hnsw.efSearch = 64
+            return index
+        return self._on_device(faiss.IndexFlatIP(dim))
+
+    def _maybe_train_ivfpq(self):
+        """
+        Swaps the flat index for a trained IVF-PQ index once ~39 vectors per cell are stored.
+        The PQ codebooks (8 bits -> 256 centroids per sub-quantizer) need as many points as
+        the coarse quantizer would for 256 cells, even when `nlist` is smaller.
+        """
+        n = len(self.docs)
+        if self.index_type != "ivfpq" or self._ivfpq_trained or n < 39 * max(self.nlist, 256):
+            return
+        dim = self._emb_store.shape[1]
+        index = faiss.IndexIVFPQ(faiss.IndexFlatIP(dim), dim, self.nlist, 16, 8, faiss.METRIC_INNER_PRODUCT)
+        vectors = self._emb_store[:n].astype(np.float32)
+        index.train(vectors)
+        index.add(vectors)
+        index.nprobe = 16
+        self.index = self._on_device(index)
+        self._ivfpq_trained = True
+        logger.info(f"Trained IVF-PQ index ({self.nlist} cells) on {n} documents.")
+
+    def _encode_docs(self, docs: List[str]) -> np.ndarray:
+        """
+        Embeds docs (L2-normalized, float32); large batches are encoded by a multi-process pool.
+        """
+        if len(docs) > self.MULTI_PROCESS_MIN_DOCS:
+            pool = self.embedder.start_multi_process_pool()
+            try:
+                embeddings = self.embedder.encode_multi_process(docs, pool, batch_size=64, normalize_embeddings=True)
+            finally:
+                self.embedder.stop_multi_process_pool(pool)
+        else:
+            embeddings = self.embedder.encode(
+                docs, convert_to_numpy=True, batch_size=64, normalize_embeddings=True, show_progress_bar=False
+            )
+        return embeddings.astype(np.float32)
 
     def add_documents(self, docs: List[str], metadatas: List[dict]):
         """
@@ -43,59 +184,206 @@ class RAGPipeline:
             docs: list of doc strings (e.g., monthly summaries)
             metadatas: list of dict metadata for each doc
         """
-        self.docs.extend(docs)
-        self.doc_metadata.extend(metadatas)
-        # Compute embeddings and build/update FAISS index
-        embeddings = self.embedder.encode(self.docs, convert_to_numpy=True, show_progress_bar=True)
+        if not docs:
+            return
+        # Only the new docs are embedded; the index is appended to, never rebuilt
+        embeddings = self._encode_docs(docs)
         if self.index is None:
-            self.index = faiss.IndexFlatL2(embeddings.shape[1])
+            self.index = self._new_index(embeddings)
+        elif self._index_mmapped:
+            self.index = self._on_device(faiss.read_index(self.index_path))
+            self._index_mmapped = False
         self.index.add(embeddings)
+        self._store_embeddings(embeddings)
+        self.docs.extend(docs)
+        self.doc_metadata.extend(metadatas)
+        self._maybe_train_ivfpq()
+        self._qcache_clear()  # cached answers were built from the old corpus
         logger.info(f"Indexed {len(self.docs)} documents in vector store.")
+        if self.index_path:
+            self.save()
 
-    def semantic_search(self, query: str, top_k: int = 5) -> List[dict]:
+    def save(self, path: Optional[str] = None):
         """
-        Returns top_k most similar docs to query.
+        Writes the FAISS index to `path` and docs, metadata and raw embeddings to `<path>.meta.pkl`.
         Args:
-            query: query string
-            top_k: number of matches to return
+            path: Target file (default: `index_path`).
+        """
+        path = path or self.index_path
+        if self.index is None or not path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            index = faiss.index_gpu_to_cpu(self.index) if self._gpu_res is not None else self.index
+            faiss.write_index(index, path + ".tmp")
+            meta = {
+                "index_type": self.index_type,
+                "nlist": self.nlist,
+                "ivfpq_trained": self._ivfpq_trained,
+                "docs": self.docs,
+                "doc_metadata": self.doc_metadata,
+                "embeddings": self._emb_store[:len(self.docs)],
+            }
+            with open(path + ".meta.pkl.tmp", "wb") as f:
+                pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+            os.replace(path + ".meta.pkl.tmp", path + ".meta.pkl")
+            logger.info(f"Saved vector store ({len(self.docs)} documents) to {path}")
+        except Exception as e:
+            logger.error(f"Failed to save vector store to {path}: {e}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, **kwargs) -> "RAGPipeline":
+        """
+        Reopens a vector store written by `save`, without re-embedding any docs.
+        Args:
+            path: Index file passed to `save` / `index_path`.
+            mmap: Memory-map the index (instant open, pages loaded on demand by the OS).
+            kwargs: Other `RAGPipeline` arguments (models, device).
         Returns:
-            List[dict]: [{"text":..., "metadata":...}]
+            RAGPipeline: Pipeline that keeps persisting to `path`.
+        """
+        with open(path + ".meta.pkl", "rb") as f:
+            meta = pickle.load(f)
+        rag = cls(index_type=meta["index_type"], nlist=meta["nlist"], index_path=path, **kwargs)
+        mmap = mmap and rag._gpu_res is None
+        try:
+            index = faiss.read_index(path, faiss.IO_FLAG_MMAP) if mmap else faiss.read_index(path)
+        except RuntimeError:
+            # Not every index type supports memory mapping
+            mmap = False
+            index = faiss.read_index(path)
+        rag.index = rag._on_device(index)
+        rag._index_mmapped = mmap
+        rag._ivfpq_trained = meta["ivfpq_trained"]
+        if len(meta["docs"]):
+            rag._store_embeddings(meta["embeddings"])  # before docs: rows are appended at len(docs)
+        rag.docs = meta["docs"]
+        rag.doc_metadata = meta["doc_metadata"]
+        logger.info(f"Loaded vector store ({len(rag.docs)} documents) from {path}")
+        return rag
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        return self.embedder.encode(queries, convert_to_numpy=True, normalize_embeddings=True).astype(np.float32)
+
+    def _search(self, emb: np.ndarray, top_k: int) -> List[List[dict]]:
         """
-        if not self.index or not self.docs:
+        Searches a batch of query embeddings in one index call; one result list per query.
+        """
+        if self.index is None or not self.docs:
             logger.warning("No docs in index.")
-            return []
-        emb = self.embedder.encode([query], convert_to_numpy=True)
-        D, I = self.index.search(emb, top_k)
+            return [[] for _ in range(emb.shape[0])]
+        compressed = self.index_type == "sq8" or self._ivfpq_trained
+        D, I = self.index.search(emb, top_k * self.RERANK_FACTOR if compressed else top_k)
         results = []
-        for idx in I[0]:
-            if idx < len(self.docs):
-                results.append({"text": self.docs[idx], "metadata": self.doc_metadata[idx]})
-        logger.info(f"Semantic search found {len(results)} results.")
+        for q, scores, row in zip(emb, D, I):
+            valid = (row >= 0) & (row < len(self.docs))  # FAISS pads missing hits with -1
+            ids, scores = row[valid], scores[valid]
+            if compressed:
+                # Quantized scores are approximate: re-rank the candidates exactly
+                scores = self._emb_store[ids].astype(np.float32) @ q
+                order = np.argsort(-scores)[:top_k]
+                ids, scores = ids[order], scores[order]
+            results.append([
+                {"text": self.docs[idx], "metadata": self.doc_metadata[idx], "score": float(score)}
+                for idx, score in zip(ids, scores)
+            ])
+        logger.info(f"Semantic search found {sum(len(r) for r in results)} results for {len(results)} queries.")
         return results
 
+    def semantic_search(self, query: Union[str, List[str]], top_k: int = 5) -> Union[List[dict], List[List[dict]]]:
+        """
+        Returns top_k most similar docs to query.
+        Pass a list of queries to search them as one batch (much faster on GPU).
+        Args:
+            query: query string, or list of query strings
+            top_k: number of matches to return
+        Returns:
+            List[dict]: [{"text":..., "metadata":..., "score": cosine similarity}] (one such list per query for a list input)
+        """
+        if isinstance(query, str):
+            return self._search(self._encode_queries([query]), top_k)[0]
+        return self._search(self._encode_queries(query), top_k)
+
+    def _qcache_clear(self):
+        self._qcache_index = None
+        self._qcache_answers: List[str] = []
+        self._qcache_top_k: List[int] = []
+        self._qcache_created: List[float] = []
+        self._qcache_used: List[float] = []
+
+    def _qcache_evict(self, i: int):
+        self._qcache_index.remove_ids(np.array([i], dtype=np.int64))  # flat index: later ids shift down
+        del self._qcache_answers[i], self._qcache_top_k[i], self._qcache_created[i], self._qcache_used[i]
+
+    def _qcache_get(self, q_emb: np.ndarray, top_k: int) -> Optional[str]:
+        """
+        Returns the cached answer of the most similar prior query with the same top_k, if close and fresh enough.
+        """
+        if self._qcache_index is None or self._qcache_index.ntotal == 0:
+            return None
+        D, I = self._qcache_index.search(q_emb, min(8, self._qcache_index.ntotal))
+        hits = [int(i) for d, i in zip(D[0], I[0]) if i >= 0 and d >= self.QCACHE_THRESHOLD and self._qcache_top_k[i] == top_k]
+        if not hits:
+            return None
+        i = hits[0]
+        now = time.monotonic()
+        if now - self._qcache_created[i] > self.QCACHE_TTL_SECONDS:
+            self._qcache_evict(i)
+            return None
+        self._qcache_used[i] = now
+        return self._qcache_answers[i]
+
+    def _qcache_put(self, q_emb: np.ndarray, top_k: int, answer: str):
+        if self._qcache_index is None:
+            self._qcache_index = faiss.IndexFlatIP(q_emb.shape[1])
+        if self._qcache_index.ntotal >= self.QCACHE_MAX_SIZE:
+            self._qcache_evict(int(np.argmin(self._qcache_used)))  # least recently used
+        now = time.monotonic()
+        self._qcache_index.add(q_emb)
+        self._qcache_answers.append(answer)
+        self._qcache_top_k.append(top_k)
+        self._qcache_created.append(now)
+        self._qcache_used.append(now)
+
     def rag_answer(self, query: str, top_k: int = 3) -> str:
         """
         Returns an LLM-generated answer/context-aware summary using top docs.
+        Near-duplicate queries (same top_k, within the cache TTL, no docs added since) are answered from
+        the semantic cache, and a top doc scoring >= DIRECT_HIT_THRESHOLD is returned directly without
+        running the LLM.
         Args:
             query: user query string
             top_k: number of top docs to include as context
         Returns:
             str: LLM-generated answer
         """
-        top_docs = self.semantic_search(query, top_k=top_k)
+        q_emb = self._encode_queries([query])
+        cached = self._qcache_get(q_emb, top_k)
+        if cached is not None:
+            logger.info("Answered RAG query from semantic cache.")
+            return cached
+        top_docs = self._search(q_emb, top_k)[0]
+        if top_docs and top_docs[0]["score"] >= self.DIRECT_HIT_THRESHOLD:
+            self.direct_hits += 1
+            logger.info(f"Answered RAG query directly from top doc (score {top_docs[0]['score']:.2f}, DIRECT_HIT={self.direct_hits}).")
+            return top_docs[0]["text"][:self.DIRECT_HIT_MAX_CHARS]
         context = " ".join([doc["text"] for doc in top_docs])
         prompt = f"Context: {context}\n\nQuestion: {query}\nAnswer:"
         try:
-            summary = self.llm(prompt, max_length=180, min_length=30, do_sample=False)
+            with torch.inference_mode():
+                summary = self.llm(prompt, max_length=180, min_length=30, do_sample=False)
             answer = summary[0]["summary_text"]
             logger.info("Generated RAG answer.")
+            self._qcache_put(q_emb, top_k, answer)
             return answer
         except Exception as e:
             logger.error(f"RAG answer generation failed: {e}")
             return "Answer unavailable."
 
 # Example usage:
-# rag = RAGPipeline()
+# rag = RAGPipeline()  # or RAGPipeline(index_type="ivfpq") for very large corpora
+# rag = RAGPipeline(index_path="data/rag.index")  # persisted after each add; later: RAGPipeline.load("data/rag.index")
 # rag.add_documents(["Summary 1...", "Summary 2..."], [{"month": "2024-06", "company": "RELIANCE"}, ...])
 # print(rag.semantic_search("What is the outlook for Reliance?"))
 # print(rag.rag_answer("Best smallcap opportunities in chemicals?"))
@@ -0,0 +1,25 @@
+"""
+Numba kernels for the rule-based screener.
+Operate on a dense (companies x 6) matrix with columns ordered as StockScreener.FILTER_COLUMNS:
+ROCE, ROE, CAGR, DE, PE, FCF.
+"""
+import numpy as np
+from numba import njit, prange
+
+@njit(parallel=True, cache=True)
+def screen_kernel(M):
+    n = M.shape[0]
+    out = np.empty(n, np.bool_)
+    for i in prange(n):
+        out[i] = (
+            M[i, 0] >= 15 and
+            M[i, 1] >= 15 and
+            M[i, 2] >= 15 and
+            M[i, 3] < 0.5 and
+            M[i, 4] < 25 and
+            M[i, 5] > 0
+        )
+    return out
+
+# Compile (or load from the on-disk cache) at import, not on the first real call
+screen_kernel(np.zeros((1, 6), np.float32))
@@ -5,7 +5,7 @@ Implements both rule-based and ML-driven screening for identifying multi-bagger
 - Modular, extendable, and ready for both filter logic and ML classifiers.
 - Handles feature engineering from financial data, sentiment, etc.
 """
-from typing import Dict, List
+from typing import Dict, List, Sequence
 import numpy as np
 from utils.logger import setup_logger
 
@@ -52,6 +52,47 @@ class StockScreener:
             logger.error(f"Filter check failed: {e}")
         return False
 
+    # (metric key, default when missing) in the column order used by the vectorized filter
+    FILTER_COLUMNS = (("ROCE", 0), ("ROE", 0), ("CAGR", 0), ("DE", 1), ("PE", 100), ("FCF", 0))
+
+    @classmethod
+    def filter_mask(cls, all_metrics: List[Dict]) -> np.ndarray:
+        """
+        Vectorized `passes_filters`: one NumPy boolean mask over a batch of companies.
+        Args:
+            all_metrics (List[Dict]): Each dict has metrics for one company.
+        Returns:
+            np.ndarray: Boolean mask, True where the company passes all filters.
+        """
+        n = len(all_metrics)
+        try:
+            roce, roe, cagr, de, pe, fcf = (
+                np.fromiter((m.get(key, default) for m in all_metrics), dtype=np.float64, count=n)
+                for key, default in cls.FILTER_COLUMNS
+            )
+        except (TypeError, ValueError) as e:
+            # Non-numeric values: fall back to per-company checks (which fail only the bad rows)
+            logger.warning(f"Vectorized filter fell back to per-company checks: {e}")
+            return np.fromiter((cls.passes_filters(m) for m in all_metrics), dtype=bool, count=n)
+        return (roce >= 15) & (roe >= 15) & (cagr >= 15) & (de < 0.5) & (pe < 25) & (fcf > 0)
+
+    @classmethod
+    def filter_matrix(cls, M: np.ndarray) -> np.ndarray:
+        """
+        Screens a dense metrics matrix with a parallel Numba kernel (for large universes / repeated runs).
+        Args:
+            M (np.ndarray): (companies x 6) matrix, columns in `FILTER_COLUMNS` order; used as float32.
+        Returns:
+            np.ndarray: Boolean mask, True where the company passes all filters.
+        Raises:
+            ValueError: If M is not a (companies x 6) matrix.
+        """
+        # The kernel indexes columns without bounds checks: a narrower matrix would read other rows' data
+        if M.ndim != 2 or M.shape[1] != len(cls.FILTER_COLUMNS):
+            raise ValueError(f"M must have shape (n, {len(cls.FILTER_COLUMNS)}), got {M.shape}")
+        from screening_ml._kernels import screen_kernel  # deferred: JIT compile on first use
+        return screen_kernel(np.ascontiguousarray(M, dtype=np.float32))
+
     def filter_stocks(self, all_metrics: List[Dict]) -> List[Dict]:
         """
         Applies rule-based filter to a batch of companies.
@@ -60,18 +101,36 @@ class StockScreener:
         Returns:
             List[Dict]: Only those passing filters.
         """
-        passed = [m for m in all_metrics if self.passes_filters(m)]
+        passed = [all_metrics[i] for i in np.flatnonzero(self.filter_mask(all_metrics))]
         logger.info(f"{len(passed)}/{len(all_metrics)} companies passed rule-based filters.")
         return passed
 
+    @staticmethod
+    def dicts_to_matrix(metrics_list: List[Dict], feature_names: Sequence[str]) -> np.ndarray:
+        """
+        Builds a dense float32 feature matrix from per-company metric dicts (missing metrics -> 0.0).
+        Args:
+            metrics_list (List[Dict]): Each dict has metrics for one company.
+            feature_names (Sequence[str]): Metric keys, in the column order the model expects.
+        Returns:
+            np.ndarray: (companies x features) C-contiguous float32 matrix, ready for `ml_predict`.
+        """
+        k = len(feature_names)
+        return np.fromiter(
+            (m.get(name, 0.0) for m in metrics_list for name in feature_names),
+            dtype=np.float32, count=len(metrics_list) * k,
+        ).reshape(-1, k)
+
     def ml_predict(self, features: np.ndarray) -> np.ndarray:
         """
         Predict multi-bagger probabilities using trained ML model.
         Args:
-            features (np.ndarray): Feature array for batch prediction.
+            features (np.ndarray): Feature array for batch prediction (see `dicts_to_matrix`).
         Returns:
             np.ndarray: Array of probabilities.
         """
+        # Estimators copy non-contiguous / non-float32 input internally; normalize it once here
+        features = np.ascontiguousarray(features, dtype=np.float32)
         if self.ml_model:
             try:
                 preds = self.ml_model.predict_proba(features)[:, 1]  # 2-class model: probability multi-bagger
@@ -86,4 +145,4 @@ class StockScreener:
 # Example usage:
 # screener = StockScreener(ml_model=your_loaded_model)
 # passed = screener.filter_stocks([metrics1, metrics2, ...])
-# probs = screener.ml_predict(feature_matrix)
+# probs = screener.ml_predict(screener.dicts_to_matrix([metrics1, metrics2, ...], ["ROCE", "ROE", "CAGR", "DE", "PE", "FCF"]))
@@ -7,8 +7,11 @@ Default: Hugging Face 'distilbert-base-uncased-finetuned-sst-2-english' sentimen
 - Modular, production-grade.
 - Extendable to FinBERT or financial domain models as needed.
 """
+import hashlib
+from collections import OrderedDict
+from functools import cached_property
 from typing import List, Dict, Tuple
-from transformers import pipeline
+from transformers import AutoTokenizer, pipeline
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -17,14 +20,85 @@ class SentimentAnalyzer:
     """
     Sentiment analyzer for forum posts, returns score [1-100] and explanation.
     """
-    def __init__(self, model_name: str = "distilbert-base-uncased-finetuned-sst-2-english", device: int = -1):
+    CACHE_MAX_SIZE = 8192
+
+    def __init__(self, model_name: str = "distilbert-base-uncased-finetuned-sst-2-english", device: int = -1, backend: str = "torch"):
+        """
+        Args:
+            model_name: Hugging Face model hub name.
+            device: -1 for CPU, or 0/1/2... for GPU.
+            backend: 'torch', or 'onnx' for an INT8-quantized ONNX Runtime model on CPU (needs `optimum[onnxruntime]`).
+        """
+        self.model_name = model_name
+        self.device = device
+        self.backend = backend
+        # LRU memo of (score, justification) keyed by a hash of the scored text, so
+        # duplicate posts (quotes, reposts, boilerplate) skip the transformer
+        self._cache: "OrderedDict[bytes, Tuple[int, str]]" = OrderedDict()
+
+    @cached_property
+    def sentiment_pipeline(self):
+        """
+        The HF sentiment pipeline, loaded on first use.
+        """
         try:
-            self.sentiment_pipeline = pipeline("sentiment-analysis", model=model_name, device=device)
-            logger.info(f"Loaded sentiment analysis model: {model_name}")
+            if self.backend == "onnx":
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+                from utils.onnx_runtime import export_quantized
+                if self.device is not None and self.device >= 0:
+                    logger.warning("The ONNX backend runs on CPU; ignoring GPU device.")
+                model = ORTModelForSequenceClassification.from_pretrained(
+                    export_quantized(ORTModelForSequenceClassification, self.model_name), file_name="model_quantized.onnx"
+                )
+                sentiment_pipeline = pipeline("sentiment-analysis", model=model, tokenizer=AutoTokenizer.from_pretrained(self.model_name))
+            else:
+                sentiment_pipeline = pipeline("sentiment-analysis", model=self.model_name, device=self.device)
+            logger.info(f"Loaded sentiment analysis model: {self.model_name}")
+            return sentiment_pipeline
         except Exception as e:
-            logger.error(f"Failed to load sentiment model {model_name}: {e}")
+            logger.error(f"Failed to load sentiment model {self.model_name}: {e}")
             raise
 
+    def warmup(self):
+        """
+        Loads the model now instead of on the first `score`/`batch_score` call.
+        """
+        self.sentiment_pipeline
+
+    @staticmethod
+    def _scale(result: Dict) -> Tuple[int, str]:
+        """
+        Maps a pipeline result {'label', 'score'} to (score 1-100, justification).
+        """
+        label = result['label']
+        score = result['score']
+        if label == 'POSITIVE':
+            scaled = int(50 + 50 * score)  # 50-100
+            justification = f"Positive tone (confidence: {score:.2f})"
+        elif label == 'NEGATIVE':
+            scaled = int(50 - 50 * score)  # 1-50
+            justification = f"Negative tone (confidence: {score:.2f})"
+        else:
+            scaled = 50
+            justification = "Neutral tone"
+        return scaled, justification
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text[:400].encode(), digest_size=16).digest()
+
+    def _cache_get(self, key: bytes):
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+        return hit
+
+    def _cache_put(self, key: bytes, value: Tuple[int, str]):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.CACHE_MAX_SIZE:
+            self._cache.popitem(last=False)
+
     def score(self, text: str) -> Tuple[int, str]:
         """
         Assigns a 1-100 sentiment score and a justification.
@@ -33,40 +107,62 @@ class SentimentAnalyzer:
         Returns:
             Tuple[int, str]: (score 1-100, justification string)
         """
+        key = self._key(text)
+        hit = self._cache_get(key)
+        if hit is not None:
+            return hit
         try:
             result = self.sentiment_pipeline(text[:400])  # Model max token limit
-            label = result[0]['label']
-            score = result[0]['score']
-            if label == 'POSITIVE':
-                scaled = int(50 + 50 * score)  # 50-100
-                justification = f"Positive tone (confidence: {score:.2f})"
-            elif label == 'NEGATIVE':
-                scaled = int(50 - 50 * score)  # 1-50
-                justification = f"Negative tone (confidence: {score:.2f})"
-            else:
-                scaled = 50
-                justification = "Neutral tone"
-            return scaled, justification
+            scored = self._scale(result[0])
+            self._cache_put(key, scored)
+            return scored
         except Exception as e:
             logger.error(f"Sentiment analysis failed: {e}")
             return 50, "Sentiment unavailable"
 
-    def batch_score(self, posts: List[str]) -> List[Dict]:
+    def batch_score(self, posts: List[str], batch_size: int = 32) -> List[Dict]:
         """
         Batch scoring for multiple posts.
+        Posts go through the pipeline in padded mini-batches rather than one forward pass each;
+        posts already scored (or repeated within the batch) are answered from the cache.
         Args:
             posts (List[str]): List of forum post texts.
+            batch_size (int): Posts per forward pass.
         Returns:
             List[Dict]: [{'text': ..., 'score': ..., 'justification': ...}]
         """
-        results = []
-        for text in posts:
-            score, justification = self.score(text)
-            results.append({'text': text, 'score': score, 'justification': justification})
-        return results
+        if not posts:
+            return []
+        keys = [self._key(text) for text in posts]
+        known = {}
+        misses = {}  # key -> first post with that key, in order
+        for key, text in zip(keys, posts):
+            if key in known or key in misses:
+                continue
+            hit = self._cache_get(key)
+            if hit is not None:
+                known[key] = hit
+            else:
+                misses[key] = text
+        if misses:
+            try:
+                outputs = self.sentiment_pipeline([text[:400] for text in misses.values()], batch_size=batch_size, truncation=True)
+                for key, result in zip(misses, outputs):
+                    known[key] = self._scale(result)
+                    self._cache_put(key, known[key])
+            except Exception as e:
+                # One bad post shouldn't sink the batch: rescore individually
+                logger.error(f"Batched sentiment analysis failed, scoring posts one by one: {e}")
+                for key, text in misses.items():
+                    known[key] = self.score(text)
+        scored = [known[key] for key in keys]
+        return [
+            {'text': text, 'score': score, 'justification': justification}
+            for text, (score, justification) in zip(posts, scored)
+        ]
 
 # Example usage:
-# sa = SentimentAnalyzer()
+# sa = SentimentAnalyzer()  # or SentimentAnalyzer(backend="onnx") for INT8 ONNX Runtime on CPU
 # out = sa.score("Company is showing strong growth and management is visionary.")
 # batch = sa.batch_score(["Good results.", "Weak quarter."])
 
@@ -2,7 +2,7 @@
 Summarization Module
 -------------------
 Production-grade module for abstractive summarization using Hugging Face Transformers.
-Default: BART-large (state-of-the-art for English summarization).
+Default: DistilBART-CNN (BART-large distilled: ~2x faster, similar ROUGE), half precision on GPU.
 
 Why BART/T5/Pegasus?
 - All three are top-performers for abstractive summarization tasks (benchmarked on CNN/DailyMail, XSum, etc.).
@@ -10,41 +10,132 @@ Why BART/T5/Pegasus?
 - T5: Highly flexible, performs well for multi-lingual/transfer cases.
 - Pegasus: State-of-the-art for extreme summarization (distills large docs into very short summaries).
 
-Here, BART-large is chosen for default: best results for long-form, discussion-style text, and mature Hugging Face support.
+Here, a distilled BART-large is chosen for default: best results for long-form, discussion-style text, and mature Hugging Face support,
+at roughly half the inference cost of the full model.
 """
 import os
+import re
+from functools import cached_property
 from typing import List, Optional
-from transformers import pipeline, Pipeline
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline, Pipeline
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def load_summarization_pipeline(model_name: str, device: Optional[int] = None, torch_dtype: Optional[torch.dtype] = None, backend: str = "torch") -> Pipeline:
+    """
+    Loads a seq2seq model in eval mode and wraps it in a summarization pipeline.
+    Args:
+        model_name: Hugging Face model hub name.
+        device: -1/None for CPU, or 0/1/2... for GPU.
+        torch_dtype: Weight dtype; defaults to float16 on GPU and float32 on CPU
+            (pass torch.bfloat16 on CPUs with native BF16 support).
+        backend: 'torch', or 'onnx' for an INT8-quantized ONNX Runtime model on CPU (needs `optimum[onnxruntime]`).
+    """
+    device = device if device is not None else -1
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        from utils.onnx_runtime import export_quantized
+        if device >= 0:
+            logger.warning("The ONNX backend runs on CPU; ignoring GPU device.")
+        model = ORTModelForSeq2SeqLM.from_pretrained(
+            export_quantized(ORTModelForSeq2SeqLM, model_name),
+            encoder_file_name="encoder_model_quantized.onnx",
+            decoder_file_name="decoder_model_quantized.onnx",
+            decoder_with_past_file_name="decoder_with_past_model_quantized.onnx",
+        )
+        return pipeline("summarization", model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+    if torch_dtype is None:
+        torch_dtype = torch.float16 if device >= 0 else torch.float32
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, torch_dtype=torch_dtype).eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=device)
+
 class Summarizer:
     """
     Abstractive summarizer for forum discussions, using Hugging Face Transformers.
     """
-    def __init__(self, model_name: str = "facebook/bart-large-cnn", device: Optional[int] = None):
+    def __init__(self, model_name: str = "sshleifer/distilbart-cnn-12-6", device: Optional[int] = None, torch_dtype: Optional[torch.dtype] = None, backend: str = "torch"):
         """
         Args:
             model_name: Hugging Face model hub name.
             device: set to -1 for CPU, or 0/1/2... for GPU (if available).
+            torch_dtype: Weight dtype (default: float16 on GPU, float32 on CPU).
+            backend: 'torch', or 'onnx' for INT8-quantized ONNX Runtime on CPU.
+        The model is loaded on first use (or by `warmup()`).
+        """
+        self.model_name = model_name
+        self.device = device
+        self.torch_dtype = torch_dtype
+        self.backend = backend
+
+    @cached_property
+    def summarizer(self) -> Pipeline:
+        """
+        The HF summarization pipeline, loaded on first use.
         """
         try:
-            model_cache_path = os.path.join(os.path.expanduser("~/.cache/huggingface/hub/models--"), model_name.replace("/", "--"))
+            model_cache_path = os.path.join(os.path.expanduser("~/.cache/huggingface/hub/models--"), self.model_name.replace("/", "--"))
             if not os.path.exists(model_cache_path):
-                logger.info(f"Model {model_name} not found in cache. Downloading...")
-            
-            self.summarizer: Pipeline = pipeline(
-                "summarization", model=model_name, device=device if device is not None else -1
-            )
-            logger.info(f"Loaded summarization pipeline with model: {model_name}")
+                logger.info(f"Model {self.model_name} not found in cache. Downloading...")
+
+            summarizer = load_summarization_pipeline(self.model_name, self.device, self.torch_dtype, self.backend)
+            logger.info(f"Loaded summarization pipeline with model: {self.model_name}")
+            return summarizer
         except Exception as e:
-            logger.error(f"Failed to load summarization model {model_name}: {e}")
+            logger.error(f"Failed to load summarization model {self.model_name}: {e}")
             raise
 
+    def warmup(self):
+        """
+        Loads the model now instead of on the first `summarize_posts` call.
+        """
+        self.summarizer
+
+    def _input_limit(self, max_length: int) -> int:
+        """
+        Token budget for one model input, leaving room for a `max_length` summary.
+        """
+        tok = self.summarizer.tokenizer
+        model_max = tok.model_max_length if tok.model_max_length < 100_000 else 1024  # unset -> huge sentinel
+        return model_max - max_length - 16
+
+    def _chunk(self, posts: List[str], max_length: int) -> List[str]:
+        """
+        Splits posts into model-sized chunks by token count, packing whole sentences where possible.
+        Posts are split into sentences one by one, so the full concatenation is never built.
+        Args:
+            posts (List[str]): Texts to split.
+            max_length (int): Max tokens in summary (reserved out of the model's input budget).
+        Returns:
+            List[str]: Chunks of at most `model_max_length - max_length - 16` tokens.
+        """
+        tok = self.summarizer.tokenizer
+        limit = self._input_limit(max_length)
+        sentences = [sentence for post in posts for sentence in _SENTENCE_END.split(post.strip()) if sentence]
+        chunks, current, current_len = [], [], 0
+        for sentence, ids in zip(sentences, tok(sentences, add_special_tokens=False)["input_ids"]):
+            if current and current_len + len(ids) > limit:
+                chunks.append(" ".join(current))
+                current, current_len = [], 0
+            if len(ids) > limit:
+                # A single over-long sentence: hard-split it by token windows
+                chunks.extend(tok.batch_decode([ids[i:i + limit] for i in range(0, len(ids), limit)], skip_special_tokens=True))
+                continue
+            current.append(sentence)
+            current_len += len(ids)
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
     def summarize_posts(self, posts: List[str], max_length: int = 180, min_length: int = 40) -> str:
         """
         Summarize a list of forum posts into a single monthly summary.
+        Long input is split into token-sized chunks that are summarized in one batched call;
+        chunk summaries are reduced pairwise until they fit a single model input.
         Args:
             posts (List[str]): List of post texts.
             max_length (int): Max tokens in summary.
@@ -52,21 +143,27 @@ class Summarizer:
         Returns:
             str: Abstractive summary.
         """
-        text = " ".join(posts)
-        if len(text) < 100:
+        if sum(len(p) for p in posts) + len(posts) - 1 < 100:
             logger.warning("Not enough text to summarize; returning raw input.")
-            return text
-        # Hugging Face models have a max token limit (1024 for BART-large)
-        text = text[:3500]  # Keep under 1024 tokens roughly
+            return " ".join(posts)
+        gen_kwargs = dict(batch_size=4, max_length=max_length, min_length=min_length, do_sample=False, truncation=True)
         try:
-            summary = self.summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
-            result = summary[0]["summary_text"]
-            logger.info(f"Generated summary ({len(result.split())} words)")
+            with torch.inference_mode():
+                chunks = self._chunk(posts, max_length)
+                summaries = [s["summary_text"] for s in self.summarizer(chunks, **gen_kwargs)]
+                # Map-reduce: re-summarize adjacent pairs until the combined summary fits one model input
+                tok = self.summarizer.tokenizer
+                limit = self._input_limit(max_length)
+                while len(summaries) > 1 and len(tok(" ".join(summaries), add_special_tokens=False)["input_ids"]) > limit:
+                    pairs = [" ".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+                    summaries = [s["summary_text"] for s in self.summarizer(pairs, **gen_kwargs)]
+            result = " ".join(summaries)
+            logger.info(f"Generated summary ({len(result.split())} words) from {len(chunks)} chunks")
             return result
         except Exception as e:
             logger.error(f"Summarization failed: {e}")
             return "Summary unavailable."
 
 # Example usage:
-# s = Summarizer()
+# s = Summarizer()  # or Summarizer(backend="onnx") for INT8 ONNX Runtime on CPU
 # summary = s.summarize_posts(["Forum post 1", "Forum post 2", ...])
@@ -0,0 +1,23 @@
+import sys
+import types
+import httpx
+from financial_data.financial_api import FinancialDataFetcher
+
+def test_eodhd_results_do_not_share_state_with_the_cache(monkeypatch):
+    fetcher = FinancialDataFetcher("key")
+    payload = b'{"General": {"Name": "Reliance"}, "Highlights": {"ROE": 9.2}}'
+    monkeypatch.setattr(fetcher.client, "get", lambda url: httpx.Response(200, content=payload, request=httpx.Request("GET", url)))
+    first = fetcher.fetch_eodhd("RELIANCE")
+    first["Highlights"]["ROE"] = -1
+    first["General"] = None
+    assert fetcher.fetch_eodhd("RELIANCE") == {"General": {"Name": "Reliance"}, "Highlights": {"ROE": 9.2}}
+
+def test_yfinance_results_do_not_share_state_with_the_cache(monkeypatch):
+    fake_yf = types.SimpleNamespace(Ticker=lambda symbol: types.SimpleNamespace(info={"symbol": symbol, "pe": 20}))
+    monkeypatch.setitem(sys.modules, "yfinance", fake_yf)
+    fetcher = FinancialDataFetcher()
+    first = fetcher.fetch_yfinance("COPYTEST.NS")
+    first["info"]["pe"] = -1
+    assert fetcher.fetch_yfinance("COPYTEST.NS") == {"info": {"symbol": "COPYTEST.NS", "pe": 20}}
+
+# test_financial_api.py
@@ -1,2 +1,27 @@
-# test_forum_scraper.py
+import pytest
+from data_ingestion.forum_scraper import ValuePickrForumScraper
+
+@pytest.fixture(scope="module")
+def scraper():
+    scraper = ValuePickrForumScraper()
+    yield scraper
+    scraper.client.close()
 
+@pytest.mark.parametrize("title, company", [
+    # Truncated right after the first suffix; trailing suffixes/punctuation are dropped
+    ("Reliance Industries Ltd", "Reliance Industries"),
+    ("ICICI Bank Ltd.", "ICICI Bank"),
+    ("Bajaj Finance Limited ~ 2024", "Bajaj Finance"),
+    # Separators and parentheses end the company part
+    ("Tata Motors - long term view", "Tata Motors"),
+    ("Asian Paints (APL)", "Asian Paints"),
+    # No suffix: title-cased
+    ("deepak nitrite: chemicals play", "Deepak Nitrite"),
+    ("Infosys", "Infosys"),
+    # A suffix at the very start is not treated as one
+    ("Ltd Something", "Ltd Something"),
+])
+def test_extract_company_from_title(scraper, title, company):
+    assert scraper.extract_company_from_title(title) == company
+
+# test_forum_scraper.py
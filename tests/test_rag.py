@@ -0,0 +1,75 @@
+import hashlib
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+from rag_pipeline.rag import RAGPipeline
+
+DIM = 32
+
+class FakeEmbedder:
+    """Deterministic, L2-normalized pseudo-embeddings (one random vector per distinct text)."""
+    def encode(self, texts, **kwargs):
+        rows = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+            v = np.random.default_rng(seed).standard_normal(DIM)
+            rows.append(v / np.linalg.norm(v))
+        return np.asarray(rows, dtype=np.float32)
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, prompt, **kwargs):
+        self.calls += 1
+        return [{"summary_text": f"answer {self.calls}"}]
+
+def make_rag(**kwargs) -> RAGPipeline:
+    rag = RAGPipeline(**kwargs)
+    # Pre-fill the lazy model properties so no real model is loaded
+    rag.__dict__["embedder"] = FakeEmbedder()
+    rag.__dict__["llm"] = FakeLLM()
+    return rag
+
+def test_answer_cache_is_keyed_on_top_k_and_cleared_by_new_docs():
+    rag = make_rag(index_type="flat")
+    rag.add_documents([f"doc {i}" for i in range(10)], [{"i": i} for i in range(10)])
+    first = rag.rag_answer("outlook?", top_k=3)
+    assert rag.rag_answer("outlook?", top_k=3) == first
+    assert rag.llm.calls == 1
+    rag.rag_answer("outlook?", top_k=5)  # different context size: not a cache hit
+    assert rag.llm.calls == 2
+    rag.add_documents(["doc 10"], [{"i": 10}])
+    rag.rag_answer("outlook?", top_k=3)  # corpus changed: cached answer is stale
+    assert rag.llm.calls == 3
+
+@pytest.mark.parametrize("index_type", ["flat", "sq8"])
+def test_small_first_batch_keeps_recall(index_type):
+    rag = make_rag(index_type=index_type)
+    docs = [f"doc {i}" for i in range(300)]
+    rag.add_documents(docs[:1], [{}])  # first batch must not fix the quantizer ranges
+    rag.add_documents(docs[1:], [{}] * 299)
+    hits = sum(result[0]["text"] == doc for doc, result in zip(docs, rag.semantic_search(docs, top_k=1)))
+    assert hits / len(docs) >= 0.99
+
+def test_ivfpq_with_small_nlist_waits_for_enough_training_points():
+    rag = make_rag(index_type="ivfpq", nlist=4)
+    docs = [f"doc {i}" for i in range(39 * 256)]
+    rag.add_documents(docs[:200], [{}] * 200)  # fewer points than the PQ codebooks need
+    assert not rag._ivfpq_trained
+    assert rag.semantic_search("doc 7", top_k=1)[0]["text"] == "doc 7"
+    for start in range(200, len(docs), 1000):  # stay on the single-process encode path
+        batch = docs[start:start + 1000]
+        rag.add_documents(batch, [{}] * len(batch))
+    assert rag._ivfpq_trained
+    hits = sum(result[0]["text"] == doc for doc, result in zip(docs[:200], rag.semantic_search(docs[:200], top_k=1)))
+    assert hits / 200 >= 0.99
+
+def test_nlist_must_be_positive():
+    with pytest.raises(ValueError):
+        RAGPipeline(index_type="ivfpq", nlist=0)
+
+# test_rag.py
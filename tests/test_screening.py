@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from screening_ml.screening import StockScreener
+
+PASSING = {"ROCE": 20, "ROE": 18, "CAGR": 16, "DE": 0.2, "PE": 20, "FCF": 100}
+
+def _variants():
+    yield PASSING
+    yield {}  # all defaults: fails
+    for key, bad in (("ROCE", 15), ("ROE", 14.9), ("CAGR", 10), ("DE", 0.5), ("PE", 25), ("FCF", 0)):
+        yield {**PASSING, key: bad}
+    yield {**PASSING, "ROCE": 15, "ROE": 15, "CAGR": 15}  # boundaries are inclusive
+    yield {**PASSING, "PE": "24.5", "FCF": "7"}  # numeric strings
+    yield {k: v for k, v in PASSING.items() if k != "DE"}  # missing DE defaults to 1: fails
+
+def test_filter_mask_matches_passes_filters():
+    metrics = list(_variants())
+    expected = [StockScreener.passes_filters(m) for m in metrics]
+    assert StockScreener.filter_mask(metrics).tolist() == expected
+
+def test_filter_mask_falls_back_on_non_numeric_values():
+    metrics = [PASSING, {**PASSING, "PE": "n/a"}, {**PASSING, "ROCE": None}]
+    assert StockScreener.filter_mask(metrics).tolist() == [True, False, False]
+
+def test_filter_mask_empty_batch():
+    assert StockScreener.filter_mask([]).shape == (0,)
+
+def test_filter_stocks_keeps_passing_companies_in_order():
+    metrics = [{**PASSING, "symbol": "A"}, {}, {**PASSING, "symbol": "B"}]
+    assert [m["symbol"] for m in StockScreener().filter_stocks(metrics)] == ["A", "B"]
+
+def test_filter_matrix_matches_filter_mask():
+    pytest.importorskip("numba")
+    metrics = [m for m in _variants() if all(not isinstance(v, str) for v in m.values())]
+    M = np.array([[m.get(k, d) for k, d in StockScreener.FILTER_COLUMNS] for m in metrics])
+    assert StockScreener.filter_matrix(M).tolist() == StockScreener.filter_mask(metrics).tolist()
+
+@pytest.mark.parametrize("shape", [(4, 5), (4, 7), (6,), (2, 3, 6)])
+def test_filter_matrix_rejects_wrong_shapes(shape):
+    with pytest.raises(ValueError):
+        StockScreener.filter_matrix(np.full(shape, 100.0))
+
+# test_screening.py
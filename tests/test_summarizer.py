@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+from summarization.summarizer import Summarizer
+
+class WordTokenizer:
+    """One token per whitespace-separated word."""
+    model_max_length = 40
+
+    def __init__(self):
+        self.vocab = {}
+        self.words = []
+
+    def _id(self, word):
+        if word not in self.vocab:
+            self.vocab[word] = len(self.words)
+            self.words.append(word)
+        return self.vocab[word]
+
+    def __call__(self, texts, add_special_tokens=True):
+        return {"input_ids": [[self._id(w) for w in text.split()] for text in texts]}
+
+    def batch_decode(self, batch, skip_special_tokens=True):
+        return [" ".join(self.words[i] for i in ids) for ids in batch]
+
+class FakePipeline:
+    def __init__(self):
+        self.tokenizer = WordTokenizer()
+
+@pytest.fixture
+def summarizer():
+    s = Summarizer()
+    s.__dict__["summarizer"] = FakePipeline()  # skip loading the real model
+    return s
+
+def sentence(n, tag):
+    return " ".join(f"{tag}{i}" for i in range(n - 1)) + f" {tag}end."
+
+def test_chunks_respect_token_limit_and_keep_sentences_whole(summarizer):
+    limit = summarizer._input_limit(max_length=10)  # 40 - 10 - 16 = 14 tokens
+    assert limit == 14
+    posts = [f"{sentence(5, 'a')} {sentence(5, 'b')} {sentence(5, 'c')}", sentence(4, "d")]
+    chunks = summarizer._chunk(posts, max_length=10)
+    assert chunks == [f"{sentence(5, 'a')} {sentence(5, 'b')}", f"{sentence(5, 'c')} {sentence(4, 'd')}"]
+    assert all(len(c.split()) <= limit for c in chunks)
+
+def test_overlong_sentence_is_split_by_token_windows(summarizer):
+    long = sentence(30, "x")
+    chunks = summarizer._chunk([sentence(3, "a"), long], max_length=10)
+    assert chunks[0] == sentence(3, "a")
+    assert [len(c.split()) for c in chunks[1:]] == [14, 14, 2]
+    assert " ".join(chunks[1:]) == long
+
+def test_no_text_is_lost(summarizer):
+    posts = [sentence(n, f"p{n}_") for n in range(1, 12)]
+    assert " ".join(summarizer._chunk(posts, max_length=10)).split() == " ".join(posts).split()
+
+# test_summarizer.py
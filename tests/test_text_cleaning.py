@@ -0,0 +1,35 @@
+import pytest
+from preprocessing import text_cleaning
+from preprocessing.text_cleaning import TextPreprocessor, _drop_spans
+
+SAMPLES = [
+    "",
+    "Plain prose, nothing to strip.",
+    "Strong Q4!!  Margins up 20% (YoY) -- see https://example.com/q4?id=1&x=2 for details",
+    "http alone stays, http:// goes",
+    "urls back to back: http://a.com/€ http://b.com/é€ end",
+    "xhttp://glued.in/word and httphttp://twice",
+    "Unicode:\tnon breaking spaces, émojis 😀 and © signs",
+    "ＦＵＬＬＷＩＤＴＨ text (NFKC) and ﬁ ligatures",
+]
+
+def test_drop_spans_merges_overlapping_and_unsorted_ranges():
+    assert _drop_spans(b"abcdefgh", [(5, 7), (1, 3), (2, 4)]) == b"aeh"
+    assert _drop_spans(b"abcdefgh", [(0, 8)]) == b""
+    assert _drop_spans(b"abc", []) == b"abc"
+
+def test_clean_text_strips_urls_and_special_chars():
+    pre = TextPreprocessor()
+    assert pre.clean_text("Visit  HTTP://X.com/a?b=1 now!! (really)") == "visit  now!! really"  # whitespace is collapsed before URLs are cut
+
+def test_clean_many_without_hyperscan_matches_clean_text():
+    pre = TextPreprocessor()
+    assert pre.clean_many(SAMPLES) == [pre.clean_text(text) for text in SAMPLES]
+
+@pytest.mark.skipif(text_cleaning.hyperscan is None, reason="hyperscan not installed")
+def test_clean_many_with_hyperscan_matches_clean_text():
+    pre = TextPreprocessor(use_hyperscan=True)
+    assert pre._hs_db is not None
+    assert pre.clean_many(SAMPLES) == [pre.clean_text(text) for text in SAMPLES]
+
+# test_text_cleaning.py
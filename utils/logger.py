@@ -11,21 +11,31 @@ from logging.config import dictConfig
 import hydra
 from omegaconf import OmegaConf
 import os
+import yaml
+
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C parser
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
 LOGGING_CONFIG_PATH = os.path.join(os.path.dirname(__file__), '../config/logging.yaml')
+_CONFIGURED = False
 
 def setup_logger(name: str = None):
     """
     Set up logger from YAML config (uses Hydra/omegaconf).
+    The YAML is read and applied only on the first call; later calls just return the logger.
     Args:
         name (str): Optional logger name for submodule logging.
     Returns:
         logging.Logger: Configured logger instance.
     """
-    import yaml
-    with open(LOGGING_CONFIG_PATH, 'r') as f:
-        config = yaml.safe_load(f)
-    dictConfig(config)
+    global _CONFIGURED
+    if not _CONFIGURED:
+        with open(LOGGING_CONFIG_PATH, 'r') as f:
+            config = yaml.load(f, Loader=_YamlLoader)
+        dictConfig(config)
+        _CONFIGURED = True
     return logging.getLogger(name)
 
 # Example usage in other modules:
@@ -0,0 +1,67 @@
+# onnx_runtime.py
+
+"""
+ONNX Runtime export utility for the AI Stock Picker project.
+- Exports Hugging Face models to ONNX via optimum (graph fusions for attention/layernorm/gelu).
+- Applies dynamic INT8 quantization (no calibration data needed).
+- Caches the quantized export on disk so it is built only once per model (published atomically).
+"""
+import os
+import platform
+import shutil
+import tempfile
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ONNX_CACHE_DIR = os.path.expanduser("~/.cache/ai_stock_picker/onnx")
+
+def _quantization_config():
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return AutoQuantizationConfig.arm64(is_static=False, per_channel=False)
+    return AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+
+def export_quantized(model_cls, model_name: str) -> str:
+    """
+    Exports `model_name` to ONNX and quantizes every graph file to dynamic INT8.
+    Args:
+        model_cls: optimum ORTModel class (e.g. ORTModelForSequenceClassification).
+        model_name (str): Hugging Face model hub name.
+    Returns:
+        str: Directory holding the `*_quantized.onnx` files and model config.
+    """
+    from optimum.onnxruntime import ORTQuantizer
+
+    quantized_dir = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "--") + "-int8")
+    if os.path.isdir(quantized_dir):
+        return quantized_dir
+    os.makedirs(ONNX_CACHE_DIR, exist_ok=True)
+    # Build in a scratch dir and move it into place only when complete, so a crash
+    # midway never leaves a half-quantized directory that later loads would trust
+    work_dir = tempfile.mkdtemp(prefix=".export-", dir=ONNX_CACHE_DIR)
+    try:
+        export_dir = os.path.join(work_dir, "fp32")
+        build_dir = os.path.join(work_dir, "int8")
+        logger.info(f"Exporting {model_name} to ONNX (one-time)...")
+        model_cls.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+        qconfig = _quantization_config()
+        # Seq2seq exports have several graphs (encoder, decoder, decoder with past); quantize each
+        for file_name in sorted(f for f in os.listdir(export_dir) if f.endswith(".onnx")):
+            ORTQuantizer.from_pretrained(export_dir, file_name=file_name).quantize(
+                save_dir=build_dir, quantization_config=qconfig
+            )
+        try:
+            os.replace(build_dir, quantized_dir)
+        except OSError:
+            if not os.path.isdir(quantized_dir):  # else another process published it first
+                raise
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)  # FP32 export and any leftovers
+    logger.info(f"Saved INT8 ONNX export of {model_name} to {quantized_dir}")
+    return quantized_dir
+
+# Example usage:
+# from optimum.onnxruntime import ORTModelForSequenceClassification
+# path = export_quantized(ORTModelForSequenceClassification, "distilbert-base-uncased-finetuned-sst-2-english")
+# model = ORTModelForSequenceClassification.from_pretrained(path, file_name="model_quantized.onnx")